@@ -1,10 +1,15 @@
-import random
+import numpy as np
 import tkinter as tk
-from Cell import Cell
 from tkinter import Canvas, messagebox
 
 BG_COLOR = '#FAECE8'
 TEXT_FONT = "Arial"
+CELL_SIZE = 60
+
+# Cell states stored in Board.states
+NORMAL = 0
+ENABLED = 1
+DISABLED = 2
 
 
 class Board:
@@ -15,15 +20,46 @@ class Board:
     def __init__(self, master, grid_size=3, should_auto_run=False):
         self.master = master
         self.grid_size = grid_size
-        self.grid = []
+        self.values = None
+        self.states = None
+        self.solution = None
         self.targets_row = []
         self.targets_col = []
+        self.row_sum = []
+        self.col_sum = []
+        self.normal_in_row = []
+        self.normal_in_col = []
+        self.row_potential = []
+        self.col_potential = []
         self.buttons = []
-        self.click_count = {}
+        self.mark_items = []
+        self.click_count = np.zeros((grid_size, grid_size), dtype=np.uint8)
         self.should_auto_run = should_auto_run
+        self.mark_images = self.create_mark_images()
 
         self.create_game()
 
+    def create_mark_images(self):
+        """
+        Pre-render the cell marks once, indexed by cell state: blank, circle (enabled) and X (disabled).
+        """
+        blank = tk.PhotoImage(master=self.master, width=CELL_SIZE, height=CELL_SIZE)
+        circle = tk.PhotoImage(master=self.master, width=CELL_SIZE, height=CELL_SIZE)
+        x_mark = tk.PhotoImage(master=self.master, width=CELL_SIZE, height=CELL_SIZE)
+        center = CELL_SIZE // 2
+        for x in range(CELL_SIZE):
+            for y in range(CELL_SIZE):
+                # Ring of width 4 around the same circle as create_oval(10, 10, 50, 50)
+                if 18 ** 2 <= (x - center) ** 2 + (y - center) ** 2 <= 22 ** 2:
+                    circle.put("green", to=(x, y))
+                # Both diagonals between 10 and 50, with a checkerboard in place of the gray50 stipple
+                on_diagonal = abs(x - y) <= 2 or abs(x + y - CELL_SIZE) <= 2
+                if 10 <= x <= 50 and 10 <= y <= 50 and on_diagonal and (x + y) % 2 == 0:
+                    x_mark.put("red", to=(x, y))
+        images = [None] * 3
+        images[NORMAL], images[ENABLED], images[DISABLED] = blank, circle, x_mark
+        return images
+
     def create_game(self):
         """
         Create the game grid and UI.
@@ -35,19 +71,27 @@ class Board:
         """
         Create the game grid with random values and solutions.
         """
-        self.grid = []
-        for i in range(self.grid_size):
-            row = []
-            for j in range(self.grid_size):
-                rand_value = random.randint(1, 9)
-                rand_solution = random.random() < 0.6
-                cell = Cell(rand_value, rand_solution)
-                row.append(cell)
-            self.grid.append(row)
+        size = (self.grid_size, self.grid_size)
+        self.values = np.random.randint(1, 10, size, dtype=np.uint8)
+        self.solution = np.random.random(size) < 0.6
 
-        self.targets_row = [sum(cell.value for cell in row if cell.solution) for row in self.grid]
-        self.targets_col = [sum(self.grid[i][j].value for i in range(self.grid_size)
-                                if self.grid[i][j].solution) for j in range(self.grid_size)]
+        solved_values = self.values * self.solution
+        self.targets_row = solved_values.sum(axis=1).tolist()
+        self.targets_col = solved_values.sum(axis=0).tolist()
+        self.clear_states()
+
+    def clear_states(self):
+        """
+        Return every cell to the normal state without touching the UI.
+        """
+        self.states = np.zeros((self.grid_size, self.grid_size), dtype=np.uint8)
+        self.row_sum = [0] * self.grid_size
+        self.col_sum = [0] * self.grid_size
+        self.normal_in_row = [self.grid_size] * self.grid_size
+        self.normal_in_col = [self.grid_size] * self.grid_size
+        # Largest sum each row/column can still reach: the values of every cell not disabled
+        self.row_potential = self.values.sum(axis=1).tolist()
+        self.col_potential = self.values.sum(axis=0).tolist()
 
     def create_ui(self):
         """
@@ -57,17 +101,18 @@ class Board:
 
         for i in range(self.grid_size):
             row_buttons = []
+            row_marks = []
             for j in range(self.grid_size):
-                btn_id = f"{i},{j}"
-                canvas = Canvas(self.master, width=60, height=60, bg="white", highlightthickness=1,
+                canvas = Canvas(self.master, width=CELL_SIZE, height=CELL_SIZE, bg="white", highlightthickness=1,
                                 highlightbackground="black")
                 canvas.grid(row=i, column=j, padx=1, pady=1)
-                number = self.grid[i][j].value
+                number = self.values[i, j]
                 canvas.create_text(30, 30, text=str(number), font=(TEXT_FONT, 18))
+                row_marks.append(canvas.create_image(30, 30, image=self.mark_images[self.states[i, j]]))
                 canvas.bind("<Button-1>", lambda event, row=i, col=j: self.handle_click(row, col))
                 row_buttons.append(canvas)
-                self.click_count[btn_id] = 0
             self.buttons.append(row_buttons)
+            self.mark_items.append(row_marks)
 
         for i in range(self.grid_size):
             tk.Label(self.master, text=f" {self.targets_row[i]}", font=(TEXT_FONT, 14), bg=BG_COLOR).grid(
@@ -81,13 +126,13 @@ class Board:
         """
         Handle the button click event.
         """
-        btn_id = f"{i},{j}"
-        self.click_count[btn_id] += 1
-        if self.click_count[btn_id] == 1:
+        self.click_count[i, j] += 1
+        clicks = self.click_count[i, j]
+        if clicks == 1:
             self.show_x(i, j)
-        elif self.click_count[btn_id] == 2:
+        elif clicks == 2:
             self.remove_x_and_show_circle(i, j)
-        elif self.click_count[btn_id] == 3:
+        elif clicks == 3:
             self.reset_button(i, j)
 
         self.check_win_condition()
@@ -96,51 +141,112 @@ class Board:
         """
         Show an X on the cell to indicate it is disabled.
         """
-        canvas = self.buttons[i][j]
-        canvas.delete("circle")
-        canvas.delete("x")
-        canvas.create_line(10, 10, 50, 50, fill="red", width=4, tags="x", stipple="gray50")
-        canvas.create_line(10, 50, 50, 10, fill="red", width=4, tags="x", stipple="gray50")
-        self.grid[i][j].disable()
+        self.disable(i, j)
+        self.draw_cell(i, j)
 
     def remove_x_and_show_circle(self, i, j):
         """
         Remove the X and show a circle to indicate the cell is enabled.
         """
-        canvas = self.buttons[i][j]
-        canvas.delete("x")
-        canvas.delete("circle")
-        canvas.create_oval(10, 10, 50, 50, outline="green", width=4, tags="circle")
-        self.grid[i][j].enable()
+        self.enable(i, j)
+        self.draw_cell(i, j)
 
     def reset_button(self, i, j):
         """
         Reset the button to its original state.
         """
-        canvas = self.buttons[i][j]
-        canvas.delete("circle")
-        canvas.delete("x")
-        self.grid[i][j].reset()
-        self.click_count[f"{i},{j}"] = 0
+        self.reset_cell(i, j)
+        self.draw_cell(i, j)
+        self.click_count[i, j] = 0
 
-    def check_win_condition(self):
+    def draw_cell(self, i, j):
+        """
+        Draw the mark of cell (i, j) according to its current state.
         """
-        Check if the win condition is met.
+        self.buttons[i][j].itemconfig(self.mark_items[i][j], image=self.mark_images[self.states[i, j]])
+
+    def repaint(self):
+        """
+        Redraw the marks of all cells from the logical state.
         """
         for i in range(self.grid_size):
             for j in range(self.grid_size):
-                if self.grid[i][j].is_normal():
-                    return False
+                self.draw_cell(i, j)
 
-        for i in range(self.grid_size):
-            if sum(self.grid[i][j].value for j in range(self.grid_size) if self.grid[i][j].is_enabled()) != \
-                    self.targets_row[i]:
-                return False
+    def enable(self, i, j):
+        """
+        Mark cell (i, j) as enabled (part of the solution).
+        """
+        self._set_state(i, j, ENABLED)
 
-        for j in range(self.grid_size):
-            if sum(self.grid[i][j].value for i in range(self.grid_size) if self.grid[i][j].is_enabled()) != \
-                    self.targets_col[j]:
-                return False
+    def disable(self, i, j):
+        """
+        Mark cell (i, j) as disabled (not part of the solution).
+        """
+        self._set_state(i, j, DISABLED)
+
+    def reset_cell(self, i, j):
+        """
+        Return cell (i, j) to the normal (unassigned) state.
+        """
+        self._set_state(i, j, NORMAL)
+
+    def _set_state(self, i, j, state):
+        """
+        Set the state of cell (i, j) and update the cached row and column sums, potentials and
+        normal-cell counts.
+        """
+        old_state = int(self.states[i, j])
+        if old_state == state:
+            return
+        value = int(self.values[i, j])
+        delta = (value if state == ENABLED else 0) - (value if old_state == ENABLED else 0)
+        self.row_sum[i] += delta
+        self.col_sum[j] += delta
+        potential_delta = (value if old_state == DISABLED else 0) - (value if state == DISABLED else 0)
+        self.row_potential[i] += potential_delta
+        self.col_potential[j] += potential_delta
+        normal_delta = (state == NORMAL) - (old_state == NORMAL)
+        self.normal_in_row[i] += normal_delta
+        self.normal_in_col[j] += normal_delta
+        self.states[i, j] = state
+
+    def is_enabled(self, i, j):
+        """
+        Return True if cell (i, j) is enabled. Otherwise, return False.
+        """
+        return self.states[i, j] == ENABLED
+
+    def is_disabled(self, i, j):
+        """
+        Return True if cell (i, j) is disabled. Otherwise, return False.
+        """
+        return self.states[i, j] == DISABLED
+
+    def is_normal(self, i, j):
+        """
+        Return True if cell (i, j) is normal. Otherwise, return False.
+        """
+        return self.states[i, j] == NORMAL
+
+    def is_assigned(self):
+        """
+        Return True if no cell on the board is normal. Otherwise, return False.
+        """
+        return not any(self.normal_in_row)
+
+    def is_solved(self):
+        """
+        Return True if every cell is assigned and all row and column targets are met. Otherwise, return False.
+        """
+        return self.is_assigned() and self.row_sum == self.targets_row and self.col_sum == self.targets_col
+
+    def check_win_condition(self):
+        """
+        Check if the win condition is met, congratulating the player when playing manually.
+        """
+        if not self.is_solved():
+            return False
         if not self.should_auto_run:
             messagebox.showinfo("Sumplete", "Congratulations! You won the game!")
         return True
@@ -149,7 +255,7 @@ class Board:
         """
         Get the current game status.
         """
-        return "solved" if self.check_win_condition() else "not solved"
+        return "solved" if self.is_solved() else "not solved"
 
     def reset(self):
         """
@@ -164,11 +270,20 @@ class Board:
                 widget.destroy()
 
         # Reset instance variables
-        self.grid = []
+        self.values = None
+        self.states = None
+        self.solution = None
         self.targets_row = []
         self.targets_col = []
+        self.row_sum = []
+        self.col_sum = []
+        self.normal_in_row = []
+        self.normal_in_col = []
+        self.row_potential = []
+        self.col_potential = []
         self.buttons = []
-        self.click_count = {}
+        self.mark_items = []
+        self.click_count = np.zeros((self.grid_size, self.grid_size), dtype=np.uint8)
 
         # Create a new game
         self.create_game()
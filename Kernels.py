@@ -0,0 +1,256 @@
+import math
+import numpy as np
+
+try:
+    from numba import njit, prange
+except ImportError:
+    prange = range
+
+    def njit(*args, **kwargs):
+        """
+        Fallback when Numba is not installed: leave the decorated function as plain Python.
+        """
+        if len(args) == 1 and callable(args[0]) and not kwargs:
+            return args[0]
+        return lambda func: func
+
+
+########################################################################################
+###########              COMPILED INNER LOOPS FOR LOCAL SEARCH               ###########
+########################################################################################
+
+@njit(cache=True)
+def line_sums(values, enabled):
+    """
+    Return the row and column sums of the enabled cells.
+    """
+    n = values.shape[0]
+    row_sums = np.zeros(n, dtype=np.int64)
+    col_sums = np.zeros(n, dtype=np.int64)
+    for i in range(n):
+        for j in range(n):
+            if enabled[i, j]:
+                row_sums[i] += values[i, j]
+                col_sums[j] += values[i, j]
+    return row_sums, col_sums
+
+
+@njit(cache=True)
+def count_violations(row_sums, col_sums, targets_row, targets_col):
+    """
+    Count the rows and columns whose sum differs from their target.
+    """
+    violations = 0
+    for k in range(row_sums.shape[0]):
+        if row_sums[k] != targets_row[k]:
+            violations += 1
+        if col_sums[k] != targets_col[k]:
+            violations += 1
+    return violations
+
+
+@njit(cache=True)
+def flip(values, enabled, row_sums, col_sums, i, j):
+    """
+    Flip cell (i, j) and update the row and column sums. Return the signed change in value.
+    """
+    delta = -values[i, j] if enabled[i, j] else values[i, j]
+    enabled[i, j] = not enabled[i, j]
+    row_sums[i] += delta
+    col_sums[j] += delta
+    return delta
+
+
+@njit(cache=True)
+def violation_change(row_sums, col_sums, targets_row, targets_col, i, j, delta):
+    """
+    Return the change in violated constraints caused by a flip of (i, j) that added delta.
+    """
+    old_row = row_sums[i] - delta
+    old_col = col_sums[j] - delta
+    return (int(row_sums[i] != targets_row[i]) - int(old_row != targets_row[i]) +
+            int(col_sums[j] != targets_col[j]) - int(old_col != targets_col[j]))
+
+
+@njit(cache=True)
+def move_violation_change(row_sums, col_sums, targets_row, targets_col, i, j, delta):
+    """
+    Return the change in violated constraints that adding delta to row i and column j would cause.
+    """
+    return (int(row_sums[i] + delta != targets_row[i]) - int(row_sums[i] != targets_row[i]) +
+            int(col_sums[j] + delta != targets_col[j]) - int(col_sums[j] != targets_col[j]))
+
+
+@njit(cache=True)
+def hill_climb(values, enabled, targets_row, targets_col, passes, restarts):
+    """
+    Hill climbing with random restarts. Each of the passes sweeps the cells in row-major order and makes
+    every move that reduces the number of violated constraints; after a pass without improvement the
+    cells set in the next restart mask are flipped. restarts holds (N, N) boolean masks that are used
+    in turn, starting over once all have been used. Return the final number of violations and the
+    number of flips made.
+    """
+    n = values.shape[0]
+    row_sums, col_sums = line_sums(values, enabled)
+    violations = count_violations(row_sums, col_sums, targets_row, targets_col)
+    moves = 0
+    restart = 0
+
+    for _ in range(passes):
+        improved = False
+        for i in range(n):
+            for j in range(n):
+                delta = -values[i, j] if enabled[i, j] else values[i, j]
+                change = move_violation_change(row_sums, col_sums, targets_row, targets_col, i, j, delta)
+                if change < 0:
+                    flip(values, enabled, row_sums, col_sums, i, j)
+                    violations += change
+                    moves += 1
+                    improved = True
+
+        if violations == 0:
+            break
+
+        if not improved:
+            mask = restarts[restart % restarts.shape[0]]
+            restart += 1
+            for i in range(n):
+                for j in range(n):
+                    if mask[i, j]:
+                        flip(values, enabled, row_sums, col_sums, i, j)
+                        moves += 1
+            violations = count_violations(row_sums, col_sums, targets_row, targets_col)
+
+    return violations, moves
+
+
+@njit(cache=True)
+def stochastic_hill_climb(values, enabled, targets_row, targets_col, cells):
+    """
+    Random walk over the pre-drawn cells: every flip is kept, and the walk stops as soon as no
+    constraint is violated. Return the final number of violations and the number of flips made.
+    """
+    row_sums, col_sums = line_sums(values, enabled)
+    violations = count_violations(row_sums, col_sums, targets_row, targets_col)
+    moves = 0
+
+    for t in range(cells.shape[0]):
+        if violations == 0:
+            break
+        i = cells[t, 0]
+        j = cells[t, 1]
+        delta = flip(values, enabled, row_sums, col_sums, i, j)
+        violations += violation_change(row_sums, col_sums, targets_row, targets_col, i, j, delta)
+        moves += 1
+
+    return violations, moves
+
+
+@njit(cache=True)
+def first_choice_hill_climb(values, enabled, targets_row, targets_col, iterations):
+    """
+    Repeatedly take the first flip (in row-major order) that reduces the number of violated
+    constraints, undoing the flips that do not, and stop when no flip improves. Return the final
+    number of violations and the number of flips made, undo flips included.
+    """
+    n = values.shape[0]
+    row_sums, col_sums = line_sums(values, enabled)
+    violations = count_violations(row_sums, col_sums, targets_row, targets_col)
+    moves = 0
+
+    for _ in range(iterations):
+        if violations == 0:
+            break
+        improved = False
+        for i in range(n):
+            for j in range(n):
+                delta = flip(values, enabled, row_sums, col_sums, i, j)
+                moves += 1
+                change = violation_change(row_sums, col_sums, targets_row, targets_col, i, j, delta)
+                if change < 0:
+                    violations += change
+                    improved = True
+                    break
+                flip(values, enabled, row_sums, col_sums, i, j)
+                moves += 1
+            if improved:
+                break
+        if not improved:
+            break
+
+    return violations, moves
+
+
+@njit(cache=True)
+def simulated_annealing(values, enabled, targets_row, targets_col, cells, accepts, temperature, cooling_rate):
+    """
+    Simulated annealing over the pre-drawn random cells, using the total distance from the targets as error.
+    accepts holds the uniform draws for the acceptance test. Return the final error and the number of
+    flips made, undo flips included.
+    """
+    n = values.shape[0]
+    row_sums, col_sums = line_sums(values, enabled)
+    error = 0
+    for k in range(n):
+        error += abs(row_sums[k] - targets_row[k]) + abs(col_sums[k] - targets_col[k])
+    moves = 0
+
+    for t in range(cells.shape[0]):
+        if error == 0:
+            break
+        i = cells[t, 0]
+        j = cells[t, 1]
+        old_terms = abs(row_sums[i] - targets_row[i]) + abs(col_sums[j] - targets_col[j])
+        flip(values, enabled, row_sums, col_sums, i, j)
+        moves += 1
+        new_error = error - old_terms + abs(row_sums[i] - targets_row[i]) + abs(col_sums[j] - targets_col[j])
+
+        if new_error < error or accepts[t] < math.exp((error - new_error) / temperature):
+            error = new_error
+        else:
+            flip(values, enabled, row_sums, col_sums, i, j)
+            moves += 1
+        temperature *= cooling_rate
+
+    return error, moves
+
+
+########################################################################################
+###########              COMPILED POPULATION OPERATORS FOR THE GA            ###########
+########################################################################################
+
+@njit(parallel=True, cache=True)
+def evaluate_population(population, values, targets_row, targets_col):
+    """
+    Return the fitness (total distance of every row and column from its target) of each individual.
+    """
+    size = population.shape[0]
+    n = values.shape[0]
+    fitness = np.empty(size, dtype=np.int64)
+    for p in prange(size):
+        error = 0
+        for i in range(n):
+            row_sum = 0
+            col_sum = 0
+            for j in range(n):
+                if population[p, i, j]:
+                    row_sum += int(values[i, j])
+                if population[p, j, i]:
+                    col_sum += int(values[j, i])
+            error += abs(row_sum - targets_row[i]) + abs(col_sum - targets_col[i])
+        fitness[p] = error
+    return fitness
+
+
+@njit(parallel=True, cache=True)
+def crossover_batch(parents1, parents2, masks):
+    """
+    Uniform crossover of each pair of parents: take the cell from parents1 where masks is set.
+    """
+    children = np.empty_like(parents1)
+    n = parents1.shape[1]
+    for p in prange(parents1.shape[0]):
+        for i in range(n):
+            for j in range(n):
+                children[p, i, j] = parents1[p, i, j] if masks[p, i, j] else parents2[p, i, j]
+    return children
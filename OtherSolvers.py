@@ -1,9 +1,11 @@
 ########################################################################################
 ###########                  OTHER SOLVERS WE TESTED                         ###########
 ########################################################################################
+from Kernels import (crossover_batch, evaluate_population, first_choice_hill_climb, simulated_annealing,
+                     stochastic_hill_climb)
+from Board import ENABLED, NORMAL
 from Solvers import BaseSolver
-import math
-import random
+import numpy as np
 import time
 
 class BacktrackingSolver(BaseSolver):
@@ -14,79 +16,92 @@ class BacktrackingSolver(BaseSolver):
     def __init__(self, board, heuristic='none'):
         super().__init__(board)
         self.heuristic = heuristic.lower()
+        if self.heuristic == 'none':
+            # The cells left to assign, in row-major order
+            self.cells = [tuple(cell) for cell in np.argwhere(board.states == NORMAL).tolist()]
 
     def solve(self):
         """
         Solve the puzzle using the Backtracking algorithm.
         """
-        return self._backtrack(0, 0)
+        solved = self._backtrack()
+        self._repaint_all()
+        return solved
 
-    def _backtrack(self, row, col):
+    def _backtrack(self):
         """
-        Recursive backtracking function to solve the puzzle.
+        Backtracking search over the normal cells, taking the next cell from _next_cell(). The search
+        keeps an explicit stack of [row, col, next state to try] for each decided cell instead of
+        recursing once per cell.
         """
-        self.num_moves += 1
-        self.board.master.update()
-        # time.sleep(0.1)
+        states = [True, False]
+        stack = []
 
-        if row == self.board.grid_size:
-            return self.board.check_win_condition()
-
-        if col == self.board.grid_size:
-            return self._backtrack(row + 1, 0)
+        self.num_moves += 1
+        self.update_board_visual()
+        cell = self._next_cell(0)
 
-        for state in [True, False]:
-            if state:
-                self._enable_cell(row, col)
+        while True:
+            if cell is None:
+                if self._final_check():
+                    return True
             else:
-                self._disable_cell(row, col)
-
-            if self._is_valid_state(row, col):
-                if col == self.board.grid_size - 1:
-                    if self._calculate_row_sum(row) != self.board.targets_row[row]:
-                        continue
+                stack.append([cell[0], cell[1], 0])
+
+            # Move the deepest cell on to its next valid state, undoing the cells that run out of states
+            while stack:
+                entry = stack[-1]
+                row, col, choice = entry
+                if choice == len(states):
+                    self._reset_cell(row, col)
+                    stack.pop()
+                    continue
+                entry[2] = choice + 1
+
+                if states[choice]:
+                    self._enable_cell(row, col)
+                else:
+                    self._disable_cell(row, col)
 
-                if row == self.board.grid_size - 1:
-                    if self._calculate_col_sum(col) != self.board.targets_col[col]:
-                        continue
+                if self._is_valid_state(row, col):
+                    break
+            else:
+                return False
 
-                if self._backtrack(row, col + 1):
-                    return True
+            self.num_moves += 1
+            self.update_board_visual()
+            # time.sleep(0.1)
+            cell = self._next_cell(len(stack))
 
-            self._reset_cell(row, col)
-        self._reset_cell(row, col)
-        return False
+    def _next_cell(self, depth):
+        """
+        Return the cell to assign at the given depth, or None once every cell is assigned.
+        heuristic='mcv' picks the cell from the most constrained line; 'none' keeps row-major order.
+        """
+        if self.heuristic == 'mcv':
+            return self._most_constrained_cell()
+        return self.cells[depth] if depth < len(self.cells) else None
 
     def _enable_cell(self, row, col):
-        """Enable the cell and update the board."""
-        self.board.remove_x_and_show_circle(row, col)
-        self.board.grid[row][col].enable()
+        """Enable the cell logically; the board is repainted separately."""
+        self.board.enable(row, col)
 
     def _disable_cell(self, row, col):
-        """Disable the cell and update the board."""
-        self.board.show_x(row, col)
-        self.board.grid[row][col].disable()
+        """Disable the cell logically; the board is repainted separately."""
+        self.board.disable(row, col)
 
     def _reset_cell(self, row, col):
-        """Reset the cell visually and logically."""
-        self.board.reset_button(row, col)
+        """Reset the cell logically; the board is repainted separately."""
+        self.board.reset_cell(row, col)
 
     def _is_valid_state(self, row, col):
-        """Check if the current state is valid."""
-        row_sum = self._calculate_row_sum(row)
-        col_sum = self._calculate_col_sum(col)
-        return (row_sum <= self.board.targets_row[row] and
-                col_sum <= self.board.targets_col[col])
-
-    def _calculate_row_sum(self, row):
-        """Calculate the sum of enabled cells in a row."""
-        return sum(cell.value for cell in self.board.grid[row] if cell.is_enabled())
-
-    def _calculate_col_sum(self, col):
-        """Calculate the sum of enabled cells in a column."""
-        return sum(self.board.grid[row][col].value
-                   for row in range(self.board.grid_size)
-                   if self.board.grid[row][col].is_enabled())
+        """
+        Check if the current state is valid: the row and column of the cell have not passed their
+        targets and can still reach them with the cells that are not disabled.
+        """
+        board = self.board
+        return (board.row_sum[row] <= board.targets_row[row] <= board.row_potential[row] and
+                board.col_sum[col] <= board.targets_col[col] <= board.col_potential[col])
 
 
 class MRVDegreeBacktrackingSolver(BaseSolver):
@@ -102,20 +117,22 @@ class MRVDegreeBacktrackingSolver(BaseSolver):
         """
         Solve the puzzle using the Backtracking algorithm with MRV and Degree heuristics.
         """
-        return self._backtrack()
+        solved = self._backtrack()
+        self._repaint_all()
+        return solved
 
     def _backtrack(self):
         """
         Recursive backtracking function to solve the puzzle.
         """
         self.num_moves += 1
-        self.board.master.update()
+        self.update_board_visual()
         # time.sleep(0.01)
 
         # Find the next cell to assign using MRV and Degree heuristics
         cell = self._select_unassigned_variable()
         if not cell:
-            return self.board.check_win_condition()
+            return self._final_check()
 
         row, col = cell
 
@@ -125,16 +142,8 @@ class MRVDegreeBacktrackingSolver(BaseSolver):
             else:
                 self._disable_cell(row, col)
 
+            # A completed row or column has sum == potential, so this also checks it hits its target
             if self._is_valid_state(row, col):
-                if all(not cell.is_normal() for cell in self.board.grid[row]):
-                    if self._calculate_row_sum(row) != self.board.targets_row[row]:
-                        self._reset_cell(row, col)
-                        continue
-
-                    if all(not row[col].is_normal() for row in self.board.grid):
-                        if self._calculate_col_sum(col) != self.board.targets_col[col]:
-                            self._reset_cell(row, col)
-                            continue
                 if self._backtrack():
                     return True
 
@@ -149,17 +158,21 @@ class MRVDegreeBacktrackingSolver(BaseSolver):
         min_remaining_values = float('inf')
         max_degree = -1
         selected_cell = None
-
-        for row in range(self.board.grid_size):
-            for col in range(self.board.grid_size):
-                if self.board.grid[row][col].is_normal():
-                    remaining_values = self._count_legal_values(row, col)
+        size = self.board.grid_size
+        is_normal = self.board.is_normal
+        count_legal_values = self._count_legal_values
+        calculate_degree = self._calculate_degree
+
+        for row in range(size):
+            for col in range(size):
+                if is_normal(row, col):
+                    remaining_values = count_legal_values(row, col)
                     if remaining_values < min_remaining_values:
                         min_remaining_values = remaining_values
-                        max_degree = self._calculate_degree(row, col)
+                        max_degree = calculate_degree(row, col)
                         selected_cell = (row, col)
                     elif remaining_values == min_remaining_values:
-                        degree = self._calculate_degree(row, col)
+                        degree = calculate_degree(row, col)
                         if degree > max_degree:
                             max_degree = degree
                             selected_cell = (row, col)
@@ -168,65 +181,48 @@ class MRVDegreeBacktrackingSolver(BaseSolver):
 
     def _count_legal_values(self, row, col):
         """
-        Count the number of legal values for a cell.
+        Count the number of legal values for a cell using the cached sums, without changing the board.
         """
+        # Enabling adds the value to the sums; disabling removes it from the potentials
+        board = self.board
         count = 0
-        for value in [True, False]:
-            if value:
-                self._enable_cell(row, col)
-            else:
-                self._disable_cell(row, col)
-
-            if self._is_valid_state(row, col):
-                count += 1
-
-            self._reset_cell(row, col)
-
+        value = int(board.values[row, col])
+        if (board.row_sum[row] + value <= board.targets_row[row] and
+                board.col_sum[col] + value <= board.targets_col[col]):
+            count += 1
+        if (board.row_potential[row] - value >= board.targets_row[row] and
+                board.col_potential[col] - value >= board.targets_col[col]):
+            count += 1
         return count
 
     def _calculate_degree(self, row, col):
         """
         Calculate the degree of a cell (number of constraints on other variables).
         """
-        degree = 0
-        for r in range(self.board.grid_size):
-            if r != row and self.board.grid[r][col].is_normal():
-                degree += 1
-        for c in range(self.board.grid_size):
-            if c != col and self.board.grid[row][c].is_normal():
-                degree += 1
-        return degree
+        board = self.board
+        own_cell = 2 if board.is_normal(row, col) else 0
+        return board.normal_in_row[row] + board.normal_in_col[col] - own_cell
 
     def _enable_cell(self, row, col):
-        """Enable the cell and update the board."""
-        self.board.remove_x_and_show_circle(row, col)
-        self.board.grid[row][col].enable()
+        """Enable the cell logically; the board is repainted separately."""
+        self.board.enable(row, col)
 
     def _disable_cell(self, row, col):
-        """Disable the cell and update the board."""
-        self.board.show_x(row, col)
-        self.board.grid[row][col].disable()
+        """Disable the cell logically; the board is repainted separately."""
+        self.board.disable(row, col)
 
     def _reset_cell(self, row, col):
-        """Reset the cell visually and logically."""
-        self.board.reset_button(row, col)
+        """Reset the cell logically; the board is repainted separately."""
+        self.board.reset_cell(row, col)
 
     def _is_valid_state(self, row, col):
-        """Check if the current state is valid."""
-        row_sum = self._calculate_row_sum(row)
-        col_sum = self._calculate_col_sum(col)
-        return (row_sum <= self.board.targets_row[row] and
-                col_sum <= self.board.targets_col[col])
-
-    def _calculate_row_sum(self, row):
-        """Calculate the sum of enabled cells in a row."""
-        return sum(cell.value for cell in self.board.grid[row] if cell.is_enabled())
-
-    def _calculate_col_sum(self, col):
-        """Calculate the sum of enabled cells in a column."""
-        return sum(self.board.grid[row][col].value
-                   for row in range(self.board.grid_size)
-                   if self.board.grid[row][col].is_enabled())
+        """
+        Check if the current state is valid: the row and column of the cell have not passed their
+        targets and can still reach them with the cells that are not disabled.
+        """
+        board = self.board
+        return (board.row_sum[row] <= board.targets_row[row] <= board.row_potential[row] and
+                board.col_sum[col] <= board.targets_col[col] <= board.col_potential[col])
 
 
 class StochasticHillClimbingSolver(BaseSolver):
@@ -234,40 +230,18 @@ class StochasticHillClimbingSolver(BaseSolver):
     Stochastic Hill Climbing solver for the Sumplete game.
     """
 
-    def calculate_violated_constraints(self):
-        """
-        Calculate the number of violated constraints.
-        """
-        violations = 0
-        for i in range(self.board.grid_size):
-            if self.calculate_sum(i, True) != self.board.targets_row[i]:
-                violations += 1
-            if self.calculate_sum(i, False) != self.board.targets_col[i]:
-                violations += 1
-        return violations
-
     def solve(self):
         """
         Solve the Sumplete game using the Stochastic Hill Climbing algorithm.
+        The search runs in a compiled kernel and only the final board is shown.
         """
-        current_violations = self.calculate_violated_constraints()
-        best_violations = current_violations
-
-        for _ in range(1000 * self.board.grid_size):
-            # Randomly select a cell and apply a move
-            i = random.randint(0, self.board.grid_size - 1)
-            j = random.randint(0, self.board.grid_size - 1)
-            self.apply_move(i, j)
-
-            violations = self.calculate_violated_constraints()
-            if violations < best_violations:
-                best_violations = violations
-                self.update_board_visual()
-
-                if best_violations == 0:
-                    break
-
-        return self.board.check_win_condition()
+        values, targets_row, targets_col = self._kernel_arrays()
+        _, moves = stochastic_hill_climb(values, self.cur_board, targets_row, targets_col,
+                                         self._random_cells(1000 * self.board.grid_size))
+        self.num_moves += moves
+        self._sync_board()
+        self._repaint_all()
+        return self.board.is_solved()
 
 
 class FirstChoiceHillClimbingSolver(BaseSolver):
@@ -275,45 +249,18 @@ class FirstChoiceHillClimbingSolver(BaseSolver):
     First-Choice Hill Climbing solver for the Sumplete game.
     """
 
-    def calculate_violated_constraints(self):
-        """
-        Calculate the number of violated constraints.
-        """
-        violations = 0
-        for i in range(self.board.grid_size):
-            if self.calculate_sum(i, True) != self.board.targets_row[i]:
-                violations += 1
-            if self.calculate_sum(i, False) != self.board.targets_col[i]:
-                violations += 1
-        return violations
-
     def solve(self):
         """
         Solve the Sumplete game using the First-Choice Hill Climbing algorithm.
+        The search runs in a compiled kernel and only the final board is shown.
         """
-        current_violations = self.calculate_violated_constraints()
-        best_violations = current_violations
-
-        for _ in range(1000 * self.board.grid_size):
-            improved = False
-            for i in range(self.board.grid_size):
-                for j in range(self.board.grid_size):
-                    # Apply move
-                    self.apply_move(i, j)
-                    violations = self.calculate_violated_constraints()
-
-                    if violations < best_violations:
-                        best_violations = violations
-                        improved = True
-                        self.update_board_visual()
-                        break  # Break the loop after the first improvement
-                if improved:
-                    break  # Exit outer loop if improvement was found
-
-            if best_violations == 0:
-                break
-
-        return self.board.check_win_condition()
+        values, targets_row, targets_col = self._kernel_arrays()
+        _, moves = first_choice_hill_climb(values, self.cur_board, targets_row, targets_col,
+                                           1000 * self.board.grid_size)
+        self.num_moves += moves
+        self._sync_board()
+        self._repaint_all()
+        return self.board.is_solved()
 
 
 class SimulatedAnnealingSolver(BaseSolver):
@@ -327,53 +274,19 @@ class SimulatedAnnealingSolver(BaseSolver):
         self.cooling_rate = cooling_rate
         self.max_iterations = max_iterations
 
-    def _calculate_error(self):
-        """
-        Calculate the error in the current state.
-        """
-        error = 0
-        for i in range(self.board.grid_size):
-            error += abs(self.calculate_sum(i, True) - self.board.targets_row[i])
-            error += abs(self.calculate_sum(i, False) - self.board.targets_col[i])
-        return error
-
-    def _get_random_cell(self):
-        """
-        Get a random cell.
-        """
-        return random.randint(0, self.board.grid_size - 1), random.randint(0, self.board.grid_size - 1)
-
-    def _accept_new_state(self, current_error, new_error):
-        """
-        Accept the new state based on the error and temperature.
-        """
-        if new_error < current_error:
-            return True
-        return random.random() < math.exp((current_error - new_error) / self.temperature)
-
     def solve(self):
         """
         Solve the Sumplete game using the Simulated Annealing algorithm.
+        The search runs in a compiled kernel and only the final board is shown.
         """
-        current_error = self._calculate_error()
-
-        for _ in range(self.max_iterations):
-            row, col = self._get_random_cell()
-            self.apply_move(row, col)
-            new_error = self._calculate_error()
-
-            if self._accept_new_state(current_error, new_error):
-                current_error = new_error
-            else:
-                self.apply_move(row, col)  # Revert the move
-
-            self.update_board_visual()
-            self.temperature *= self.cooling_rate
-
-            if current_error == 0:
-                break
-
-        return self.board.check_win_condition()
+        values, targets_row, targets_col = self._kernel_arrays()
+        _, moves = simulated_annealing(values, self.cur_board, targets_row, targets_col,
+                                       self._random_cells(self.max_iterations), self.rng.random(self.max_iterations),
+                                       self.temperature, self.cooling_rate)
+        self.num_moves += moves
+        self._sync_board()
+        self._repaint_all()
+        return self.board.is_solved()
 
 
 class GeneticAlgorithmSolver(BaseSolver):
@@ -387,87 +300,72 @@ class GeneticAlgorithmSolver(BaseSolver):
         self.generations = generations
         self.elite_size = elite_size
         self.tournament_size = tournament_size
+        self.values, self.targets_row, self.targets_col = self._kernel_arrays()
 
-    def _create_individual(self):
+    def _create_population(self):
         """
-        Create a random individual.
+        Create a random population as a boolean (population_size, N, N) array of enabled cells.
         """
-        return [[random.choice([True, False]) for _ in range(self.board.grid_size)]
-                for _ in range(self.board.grid_size)]
+        return self.rng.random((self.population_size, self.board.grid_size, self.board.grid_size)) < 0.5
 
-    def _calculate_fitness(self, individual):
+    def _crossover(self, parents1, parents2):
         """
-        Calculate the fitness of an individual.
+        Perform uniform crossover between each pair of parents.
         """
-        error = 0
-        for i in range(self.board.grid_size):
-            row_sum = sum(self.board.grid[i][j].value for j in range(self.board.grid_size) if individual[i][j])
-            col_sum = sum(self.board.grid[j][i].value for j in range(self.board.grid_size) if individual[j][i])
-            error += abs(row_sum - self.board.targets_row[i]) + abs(col_sum - self.board.targets_col[i])
-        return error
+        masks = self.rng.random(parents1.shape) < 0.5
+        return crossover_batch(parents1, parents2, masks)
 
-    def _crossover(self, parent1, parent2):
+    def _mutate(self, individuals):
         """
-        Perform crossover between two parents.
+        Mutate each individual by flipping one random cell.
         """
-        return [[random.choice([parent1[i][j], parent2[i][j]])
-                 for j in range(self.board.grid_size)]
-                for i in range(self.board.grid_size)]
+        cells = self._random_cells(len(individuals))
+        individuals[np.arange(len(individuals)), cells[:, 0], cells[:, 1]] ^= True
+        return individuals
 
-    def _get_random_cell(self):
+    def _select_parents(self, fitness, count):
         """
-        Get a random cell.
+        Select the indices of count parents using tournament selection on the precomputed fitness values.
         """
-        return random.randint(0, self.board.grid_size - 1), random.randint(0, self.board.grid_size - 1)
-
-    def _mutate(self, individual):
-        """
-        Mutate an individual.
-        """
-        i, j = self._get_random_cell()
-        individual[i][j] = not individual[i][j]
-        return individual
-
-    def _select_parent(self, population):
-        """
-        Select a parent using tournament selection.
-        """
-        tournament = random.sample(population, self.tournament_size)
-        return min(tournament, key=self._calculate_fitness)
+        tournaments = self.rng.random((count, len(fitness))).argsort(axis=1)[:, :self.tournament_size]
+        winners = fitness[tournaments].argmin(axis=1)
+        return tournaments[np.arange(count), winners]
 
     def _update_board(self, solution):
         """
-        Update the board based on the solution.
+        Update the board based on the solution, touching only the cells whose state differs.
+        The board is repainted once by solve() afterwards.
         """
-        for i in range(self.board.grid_size):
-            for j in range(self.board.grid_size):
-                if solution[i][j]:
-                    self.board.remove_x_and_show_circle(i, j)
-                else:
-                    self.board.show_x(i, j)
-                self.update_board_visual()
+        changed = np.argwhere((solution != (self.board.states == ENABLED)) | (self.board.states == NORMAL))
+        for i, j in changed.tolist():
+            if solution[i, j]:
+                self.board.enable(i, j)
+            else:
+                self.board.disable(i, j)
 
     def solve(self):
         """
         Solve the Sumplete game using the Genetic Algorithm.
         """
-        population = [self._create_individual() for _ in range(self.population_size)]
+        population = self._create_population()
+        num_children = max(self.population_size - self.elite_size, 0)
 
         for _ in range(self.generations):
-            population.sort(key=self._calculate_fitness)
+            # Evaluate every individual once per generation
+            fitness = evaluate_population(population, self.values, self.targets_row, self.targets_col)
+            order = np.argsort(fitness, kind='stable')
+            population = population[order]
+            fitness = fitness[order]
 
-            if self._calculate_fitness(population[0]) == 0:
+            if fitness[0] == 0:
                 self._update_board(population[0])
                 break
 
-            new_population = population[:self.elite_size]
-
-            while len(new_population) < self.population_size:
-                parent1 = self._select_parent(population)
-                parent2 = self._select_parent(population)
-                child = self._mutate(self._crossover(parent1, parent2))
-                new_population.append(child)
+            parents1 = population[self._select_parents(fitness, num_children)]
+            parents2 = population[self._select_parents(fitness, num_children)]
+            children = self._mutate(self._crossover(parents1, parents2))
 
-            population = new_population
+            population = np.concatenate((population[:self.elite_size], children))
 
-        return self.board.check_win_condition()
+        self._repaint_all()
+        return self.board.is_solved()
@@ -1,6 +1,39 @@
+import functools
 import math
-import random
+import multiprocessing
+import os
 import time
+import numpy as np
+from Board import ENABLED
+from Kernels import hill_climb
+
+VISUAL_STRIDE = 1024
+FRAME_INTERVAL = 1 / 30
+RESTART_MASKS = 256
+
+
+@functools.lru_cache(maxsize=1 << 16)
+def _lcv_costs(row_sum, col_sum, value, target_row, target_col):
+    """
+    Return the LCV scores of enabling and of disabling a cell with the given value: the distance of its
+    row and column sums from their targets after the assignment.
+    """
+    enabled = abs(row_sum + value - target_row) + abs(col_sum + value - target_col)
+    disabled = abs(row_sum - target_row) + abs(col_sum - target_col)
+    return enabled, disabled
+
+
+def _hc_attempt(values, enabled, targets_row, targets_col, passes, seed):
+    """
+    Run one hill-climbing attempt from the enabled start, drawing its restart masks from seed.
+    Return (violations, enabled, moves). Kept at module level so worker processes can run it.
+    """
+    size = values.shape[0]
+    # A bounded pool of restart masks, each cell flipped with probability 0.3
+    count = min(passes, RESTART_MASKS)
+    restarts = np.random.default_rng(seed).random((count, size, size), dtype=np.float32) < 0.3
+    violations, moves = hill_climb(values, enabled, targets_row, targets_col, passes, restarts)
+    return violations, enabled, moves
 
 
 class BaseSolver:
@@ -10,35 +43,95 @@ class BaseSolver:
 
     def __init__(self, board, num_moves=0):
         self.board = board
-        self.cur_board = [[cell.is_enabled() for cell in row] for row in self.board.grid]
+        self.cur_board = self.board.states == ENABLED
         self.num_moves = num_moves
+        self.rng = np.random.default_rng()
+        self.visual = not board.should_auto_run
+        self.stride = 1 if self.visual else VISUAL_STRIDE
+        self.next_update = self.stride
+        self.last_update = 0.0
 
-    def apply_move(self, i: int, j: int):
+    def _most_constrained_cell(self):
         """
-        Apply a move to the board by flipping the state of cell (i, j).
+        Select the unassigned cell with the largest value in the most constrained line: the row or column
+        whose remaining cells are closest to being forced (all disabled or all enabled), with fewer
+        remaining cells breaking ties.
         """
-        if self.cur_board[i][j]:
-            self.board.show_x(i, j)
-            self.cur_board[i][j] = False
-        else:
-            self.board.remove_x_and_show_circle(i, j)
-            self.cur_board[i][j] = True
-        self.num_moves += 1
+        board = self.board
+        size = board.grid_size
+        best_key = None
+        best_line = None
+
+        for index in range(size):
+            if board.normal_in_row[index]:
+                target = board.targets_row[index]
+                key = (min(target - board.row_sum[index], board.row_potential[index] - target),
+                       board.normal_in_row[index])
+                if best_key is None or key < best_key:
+                    best_key, best_line = key, [(index, col) for col in range(size)]
+            if board.normal_in_col[index]:
+                target = board.targets_col[index]
+                key = (min(target - board.col_sum[index], board.col_potential[index] - target),
+                       board.normal_in_col[index])
+                if best_key is None or key < best_key:
+                    best_key, best_line = key, [(row, index) for row in range(size)]
+
+        if best_line is None:
+            return None
+        return max((cell for cell in best_line if board.is_normal(*cell)), key=lambda cell: board.values[cell])
+
+    def _random_cells(self, count):
+        """
+        Draw count random (row, col) cells at once as an int64 (count, 2) array.
+        """
+        return self.rng.integers(0, self.board.grid_size, size=(count, 2))
 
-    def calculate_sum(self, index, is_row):
+    def _kernel_arrays(self):
         """
-        Calculate the sum of enabled cells in a row or column.
+        Return the cell values as an int8 array and the row and column targets as int32 arrays for the
+        compiled kernels. The kernels accumulate sums in int64.
         """
-        if is_row:
-            return sum(self.board.grid[index][j].value for j in range(self.board.grid_size) if self.cur_board[index][j])
-        return sum(self.board.grid[i][index].value for i in range(self.board.grid_size) if self.cur_board[i][index])
+        return (self.board.values.astype(np.int8),
+                np.array(self.board.targets_row, dtype=np.int32),
+                np.array(self.board.targets_col, dtype=np.int32))
+
+    def _sync_board(self):
+        """
+        Copy the solver's enabled/disabled assignment onto the board's logical state.
+        """
+        for i in range(self.board.grid_size):
+            for j in range(self.board.grid_size):
+                if self.cur_board[i, j]:
+                    self.board.enable(i, j)
+                else:
+                    self.board.disable(i, j)
+
+    def _final_check(self):
+        """
+        Check the board at a search leaf. Every cell is assigned and each row was checked against
+        its target when it was completed, so only the column sums are left to compare.
+        """
+        return self.board.col_sum == self.board.targets_col
 
     def update_board_visual(self):
         """
-        Update the board visualization.
+        Update the board visualization, checking once every `stride` moves and drawing at most
+        once every FRAME_INTERVAL seconds. When auto-running the stride is large, so the per-move
+        drawing is skipped but the window still repaints and handles events.
         """
+        if self.num_moves >= self.next_update:
+            self.next_update = self.num_moves + self.stride
+            now = time.monotonic()
+            if now - self.last_update >= FRAME_INTERVAL:
+                self.last_update = now
+                self._repaint_all()
+
+    def _repaint_all(self):
+        """
+        Redraw the whole board from the logical cell states and let Tk process it.
+        """
+        self.board.repaint()
         self.board.master.update()
-        # time.sleep(0.1)
 
 
 ########################################################################################
@@ -48,59 +141,43 @@ class BaseSolver:
 class HillClimbingSolver(BaseSolver):
     """
     Hill Climbing solver for the Sumplete game. Using Random-Restart.
+    With workers > 1 (by default one per CPU), an unsuccessful first attempt is followed by
+    workers - 1 independently seeded attempts running in parallel processes.
     """
 
-    def calculate_violated_constraints(self):
-        """
-        Calculate the number of violated constraints.
-        """
-        violations = 0
-        for i in range(self.board.grid_size):
-            if self.calculate_sum(i, True) != self.board.targets_row[i]:
-                violations += 1
-            if self.calculate_sum(i, False) != self.board.targets_col[i]:
-                violations += 1
-        return violations
-
-    def random_restart(self):
-        """
-        Randomly restart the board.
-        """
-        for i in range(self.board.grid_size):
-            for j in range(self.board.grid_size):
-                if random.random() < 0.3:
-                    self.apply_move(i, j)
-        self.update_board_visual()
+    def __init__(self, board, workers=None):
+        super().__init__(board)
+        self.workers = workers if workers is not None else os.cpu_count() or 1
 
     def solve(self):
         """
         Solve the Sumplete game using the Hill Climbing algorithm.
+        The search runs in a compiled kernel and only the final board is shown.
         """
-        current_violations = self.calculate_violated_constraints()
-        best_violations = current_violations
-
-        for _ in range(1000 * self.board.grid_size):
-            improved = False
-            for i in range(self.board.grid_size):
-                for j in range(self.board.grid_size):
-                    self.apply_move(i, j)
-                    violations = self.calculate_violated_constraints()
+        values, targets_row, targets_col = self._kernel_arrays()
+        passes = 1000 * self.board.grid_size
+        seeds = self.rng.integers(0, 2 ** 62, size=self.workers).tolist()
+        start = self.cur_board.copy()
+
+        # The first attempt runs here, which also loads the kernel before any worker is forked
+        best_violations, _, moves = _hc_attempt(values, self.cur_board, targets_row, targets_col, passes, seeds[0])
+        self.num_moves += moves
+
+        if best_violations and self.workers > 1:
+            attempt = functools.partial(_hc_attempt, values, start, targets_row, targets_col, passes)
+            with multiprocessing.Pool(self.workers - 1) as pool:
+                # Take the first attempt that solves the board, otherwise the one closest to it
+                for violations, enabled, moves in pool.imap_unordered(attempt, seeds[1:]):
+                    self.num_moves += moves
                     if violations < best_violations:
                         best_violations = violations
-                        improved = True
-                    else:
-                        self.apply_move(i, j)
-
-                    self.update_board_visual()
-
-            if best_violations == 0:
-                break
+                        self.cur_board = enabled
+                    if violations == 0:
+                        break
 
-            if not improved:
-                self.random_restart()
-                best_violations = self.calculate_violated_constraints()
-
-        return self.board.check_win_condition()
+        self._sync_board()
+        self._repaint_all()
+        return self.board.is_solved()
 
 
 class LCVBacktrackingSolver(BaseSolver):
@@ -115,114 +192,83 @@ class LCVBacktrackingSolver(BaseSolver):
         """
         Solve the puzzle using the Backtracking algorithm with LCV heuristic.
         """
-        return self._backtrack()
+        solved = self._backtrack()
+        self._repaint_all()
+        return solved
 
-    def _backtrack(self, row=None, col=None):
+    def _backtrack(self):
         """
-        Recursive backtracking function to solve the puzzle.
+        Backtracking search taking each next cell from the most constrained line. The search keeps an
+        explicit stack of (row, col, iterator over the LCV-ordered values still to try) for each
+        decided cell instead of recursing.
         """
-        self.num_moves += 1
-        self.board.master.update()
-
-        # Find the next empty cell
-        empty_cell = self._find_empty_cell()
-        if not empty_cell:
-            return self.board.check_win_condition()
+        stack = []
 
-        row, col = empty_cell
-
-        # Get the possible values (True/False) ordered by least constraining value
-        for value in self._least_constraining_values(row, col):
-            if value:
-                self._enable_cell(row, col)
-            else:
-                self._disable_cell(row, col)
-
-            if self._is_valid_state(row, col):
-                if all(not cell.is_normal() for cell in self.board.grid[row]):
-                    if self._calculate_row_sum(row) != self.board.targets_row[row]:
-                        self._reset_cell(row, col)
-                        continue
-
-                if all(not row[col].is_normal() for row in self.board.grid):
-                    if self._calculate_col_sum(col) != self.board.targets_col[col]:
-                        self._reset_cell(row, col)
-                        continue
+        self.num_moves += 1
+        self.update_board_visual()
 
-                if self._backtrack():
+        while True:
+            cell = self._most_constrained_cell()
+            if cell is None:
+                if self._final_check():
                     return True
+            else:
+                row, col = cell
+                # Get the possible values (True/False) ordered by least constraining value
+                stack.append((row, col, iter(self._least_constraining_values(row, col))))
+
+            # Move the deepest cell on to its next valid value, undoing the cells that run out of values
+            while stack:
+                row, col, values = stack[-1]
+                value = next(values, None)
+                if value is None:
+                    self._reset_cell(row, col)
+                    stack.pop()
+                    continue
+
+                if value:
+                    self._enable_cell(row, col)
+                else:
+                    self._disable_cell(row, col)
+
+                # A completed row or column has sum == potential, so this also checks it hits its target
+                if self._is_valid_state(row, col):
+                    break
+            else:
+                return False
 
-            self._reset_cell(row, col)
-
-        return False
-
-    def _find_empty_cell(self):
-        """
-        Find the next empty normal cell in the grid.
-        """
-        for row in range(self.board.grid_size):
-            for col in range(self.board.grid_size):
-                if self.board.grid[row][col].is_normal():
-                    return row, col
-        return None
+            self.num_moves += 1
+            self.update_board_visual()
 
     def _least_constraining_values(self, row, col):
         """
         Determine the order of values to try based on the Least Constraining Value heuristic.
+        The scores depend only on the cell's value and its row and column sums and targets, so they are
+        looked up in a cache instead of probing each value on the board.
         """
-        constraints = []
-        for value in [True, False]:
-            if value:
-                self._enable_cell(row, col)
-            else:
-                self._disable_cell(row, col)
-
-            constraint_count = self._count_constraints(row, col)
-            constraints.append((value, constraint_count))
-
-            self._reset_cell(row, col)
-
-        return [value for value, _ in sorted(constraints, key=lambda x: x[1])]
-
-    def _count_constraints(self, row, col):
-        """
-        Count the number of constraints imposed by the current cell state on its row and column.
-        """
-        violations = 0
-        for i in range(self.board.grid_size):
-            if self.calculate_sum(i, True) > self.board.targets_row[i]:
-                violations += 1
-            if self.calculate_sum(i, False) > self.board.targets_col[i]:
-                violations += 1
-        return violations
+        board = self.board
+        enabled, disabled = _lcv_costs(board.row_sum[row], board.col_sum[col], int(board.values[row, col]),
+                                       board.targets_row[row], board.targets_col[col])
+        # Ties keep True first, as the stable sort over (True, False) did
+        return (True, False) if enabled <= disabled else (False, True)
 
     def _enable_cell(self, row, col):
-        """Enable the cell and update the board."""
-        self.board.remove_x_and_show_circle(row, col)
-        self.board.grid[row][col].enable()
+        """Enable the cell logically; the board is repainted separately."""
+        self.board.enable(row, col)
 
     def _disable_cell(self, row, col):
-        """Disable the cell and update the board."""
-        self.board.show_x(row, col)
-        self.board.grid[row][col].disable()
+        """Disable the cell logically; the board is repainted separately."""
+        self.board.disable(row, col)
 
     def _reset_cell(self, row, col):
-        """Reset the cell visually and logically."""
-        self.board.reset_button(row, col)
+        """Reset the cell logically; the board is repainted separately."""
+        self.board.reset_cell(row, col)
 
     def _is_valid_state(self, row, col):
-        """Check if the current state is valid."""
-        row_sum = self._calculate_row_sum(row)
-        col_sum = self._calculate_col_sum(col)
-        return (row_sum <= self.board.targets_row[row] and
-                col_sum <= self.board.targets_col[col])
-
-    def _calculate_row_sum(self, row):
-        """Calculate the sum of enabled cells in a row."""
-        return sum(cell.value for cell in self.board.grid[row] if cell.is_enabled())
-
-    def _calculate_col_sum(self, col):
-        """Calculate the sum of enabled cells in a column."""
-        return sum(self.board.grid[row][col].value
-                   for row in range(self.board.grid_size)
-                   if self.board.grid[row][col].is_enabled())
+        """
+        Check if the current state is valid: the row and column of the cell have not passed their
+        targets and can still reach them with the cells that are not disabled.
+        """
+        board = self.board
+        return (board.row_sum[row] <= board.targets_row[row] <= board.row_potential[row] and
+                board.col_sum[col] <= board.targets_col[col] <= board.col_potential[col])